@@ -15,6 +15,7 @@ To mitigate this risk, madmom-modern provides:
 
 Always use the secure loading functions provided by this module:
 - `secure_load(filepath)` - Load with hash verification and restricted unpickling
+- `secure_load_many(filepaths)` - Load a model ensemble, verifying in parallel
 - `load_model(path)` - Load bundled models by relative path
 
 NEVER load pickle files from untrusted sources!
@@ -28,14 +29,16 @@ Please see the LICENSE file for licensing details of this package.
 
 from __future__ import absolute_import, division, print_function
 
-import os
-import glob
+import fnmatch as _fnmatch
+import glob as _glob
+import os as _os
 
-MODEL_PATH = os.path.dirname(__file__)
+MODEL_PATH = _os.path.dirname(__file__)
 
 # Import secure loading utilities
 from .secure_loader import (
     secure_load,
+    secure_load_many,
     load_model,
     verify_model_integrity,
     ModelIntegrityError,
@@ -43,6 +46,41 @@ from .secure_loader import (
 )
 
 
+# cached listings of the bundled model directories, which do not change at
+# runtime (listings of user supplied paths are never cached)
+_dir_cache = {}
+
+
+def _listdir(path, cache=False):
+    """
+    List the names of all entries of a directory.
+
+    Parameters
+    ----------
+    path : str
+        Directory to be listed.
+    cache : bool, optional
+        Cache the listing of existing directories and reuse cached listings.
+
+    Returns
+    -------
+    names : list
+        Names of the directory entries (empty if the directory does not
+        exist).
+
+    """
+    if cache and path in _dir_cache:
+        return _dir_cache[path]
+    try:
+        with _os.scandir(path) as entries:
+            names = [entry.name for entry in entries]
+    except OSError:
+        return []
+    if cache:
+        _dir_cache[path] = names
+    return names
+
+
 def models(pattern, path=MODEL_PATH):
     """
     Retrieve all models in path given a file name pattern.
@@ -59,43 +97,78 @@ def models(pattern, path=MODEL_PATH):
     models : list
         Sorted list of matching model file names.
 
-    """
-    return sorted(glob.glob('%s/%s' % (path, pattern)))
-
-
-# beats
-BEATS_LSTM = models('beats/2016/beats_lstm_[1-8].pkl')
-BEATS_BLSTM = models('beats/2015/beats_blstm_[1-8].pkl')
-BEATS_TCN = models("beats/2019/beats_tcn_[1-8].pkl")
-
-# downbeats
-DOWNBEATS_BLSTM = models('downbeats/2016/downbeats_blstm_[1-8].pkl')
-DOWNBEATS_BGRU = [models('downbeats/2016/downbeats_bgru_rhythmic_*.pkl'),
-                  models('downbeats/2016/downbeats_bgru_harmonic_*.pkl')]
-# notes
-NOTES_BRNN = models('notes/2013/notes_brnn.pkl')
-NOTES_CNN = models('notes/2019/notes_cnn.pkl')
-NOTES_CNN_MIREX = models('notes/2018/notes_cnn_[12].pkl')
-
-# onsets
-ONSETS_RNN = models('onsets/2013/onsets_rnn_[1-8].pkl')
-ONSETS_BRNN = models('onsets/2013/onsets_brnn_[1-8].pkl')
-ONSETS_BRNN_PP = models('onsets/2014/onsets_brnn_pp_[1-8].pkl')
-ONSETS_CNN = models('onsets/2013/onsets_cnn.pkl')
+    Notes
+    -----
+    Listings of the bundled model directories are cached, so all models
+    sharing a directory are retrieved with a single directory scan.
 
-# patterns
-PATTERNS_BALLROOM = models('patterns/2013/ballroom_pattern_[34]_4.pkl')
-
-# chroma
-CHROMA_DNN = models('chroma/2016/chroma_dnn.pkl')
-
-# chords
-CHORDS_DCCRF = models('chords/2016/chords_dccrf.pkl')
-CHORDS_CNN_FEAT = models('chords/2016/chords_cnnfeat.pkl')
-CHORDS_CFCRF = models('chords/2016/chords_cnncrf.pkl')
-
-# key
-KEY_CNN = models('key/2018/key_cnn.pkl')
-
-# keep namespace clean
-del os, glob
+    """
+    dirname, name_pattern = _os.path.split('%s/%s' % (path, pattern))
+    # wildcards in the directory part are rare and patterns ending with a
+    # separator match the directory itself, let glob handle these cases
+    if not name_pattern or _glob.has_magic(dirname):
+        return sorted(_glob.glob('%s/%s' % (path, pattern)))
+    names = _listdir(dirname, cache=path == MODEL_PATH)
+    # like glob, ignore hidden files unless explicitly asked for
+    if not name_pattern.startswith('.'):
+        names = [n for n in names if not n.startswith('.')]
+    return sorted(_os.path.join(dirname, n)
+                  for n in _fnmatch.filter(names, name_pattern))
+
+
+# model file patterns; the lists of model files are retrieved lazily on first
+# access of the respective module attribute (see `__getattr__`)
+_PATTERNS = {
+    # beats
+    'BEATS_LSTM': 'beats/2016/beats_lstm_[1-8].pkl',
+    'BEATS_BLSTM': 'beats/2015/beats_blstm_[1-8].pkl',
+    'BEATS_TCN': 'beats/2019/beats_tcn_[1-8].pkl',
+    # downbeats
+    'DOWNBEATS_BLSTM': 'downbeats/2016/downbeats_blstm_[1-8].pkl',
+    'DOWNBEATS_BGRU': ('downbeats/2016/downbeats_bgru_rhythmic_*.pkl',
+                       'downbeats/2016/downbeats_bgru_harmonic_*.pkl'),
+    # notes
+    'NOTES_BRNN': 'notes/2013/notes_brnn.pkl',
+    'NOTES_CNN': 'notes/2019/notes_cnn.pkl',
+    'NOTES_CNN_MIREX': 'notes/2018/notes_cnn_[12].pkl',
+    # onsets
+    'ONSETS_RNN': 'onsets/2013/onsets_rnn_[1-8].pkl',
+    'ONSETS_BRNN': 'onsets/2013/onsets_brnn_[1-8].pkl',
+    'ONSETS_BRNN_PP': 'onsets/2014/onsets_brnn_pp_[1-8].pkl',
+    'ONSETS_CNN': 'onsets/2013/onsets_cnn.pkl',
+    # patterns
+    'PATTERNS_BALLROOM': 'patterns/2013/ballroom_pattern_[34]_4.pkl',
+    # chroma
+    'CHROMA_DNN': 'chroma/2016/chroma_dnn.pkl',
+    # chords
+    'CHORDS_DCCRF': 'chords/2016/chords_dccrf.pkl',
+    'CHORDS_CNN_FEAT': 'chords/2016/chords_cnnfeat.pkl',
+    'CHORDS_CFCRF': 'chords/2016/chords_cnncrf.pkl',
+    # key
+    'KEY_CNN': 'key/2018/key_cnn.pkl',
+}
+
+__all__ = ['MODEL_PATH', 'models', 'secure_load', 'secure_load_many',
+           'load_model', 'verify_model_integrity', 'ModelIntegrityError',
+           'UnsafePickleError'] + list(_PATTERNS)
+
+
+def __getattr__(name):
+    """Retrieve the model files of the requested model lazily (PEP 562)."""
+    try:
+        pattern = _PATTERNS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" %
+                             (__name__, name)) from None
+    if isinstance(pattern, tuple):
+        # multiple groups of models
+        value = [models(p) for p in pattern]
+    else:
+        value = models(pattern)
+    # cache as a regular module attribute, __getattr__ is not called again
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_PATTERNS))
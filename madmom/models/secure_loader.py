@@ -2,9 +2,10 @@
 Secure Model Loader for madmom
 
 This module provides secure loading of pickle model files with:
-1. SHA256 hash verification to detect tampering
+1. SHA256 hash verification to detect tampering (hashes of unchanged files
+   are cached in the user's cache directory)
 2. Restricted unpickler to limit code execution risks
-3. Allowlisting of known-safe modules and classes
+3. Allowlisting of known-safe classes and functions
 
 SECURITY WARNING:
 Pickle files can execute arbitrary code when loaded. This secure loader
@@ -19,79 +20,115 @@ For more information on pickle security risks, see:
 import hashlib
 import io
 import json
+import mmap
+import os
 import pickle
+import sys
+import tempfile
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Any, Optional, Set
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 # Directory containing this file
 MODELS_DIR = Path(__file__).parent
-
-# Allowlisted modules and classes that are safe to unpickle
-# These are the modules used by madmom's neural network models
-SAFE_MODULES: Set[str] = {
-    'numpy',
-    'numpy.core.multiarray',
-    'numpy.core.numeric',
-    'numpy._core.multiarray',
-    'numpy._core.numeric',
-    'scipy.sparse',
-    'scipy.sparse._csr',
-    'scipy.sparse.csr',
-    'collections',
-    'builtins',
-    # madmom modules
-    'madmom.ml.nn',
-    'madmom.ml.nn.layers',
-    'madmom.ml.nn.activations',
-    'madmom.ml.hmm',
-    'madmom.ml.crf',
-    'madmom.features.beats_hmm',
-}
-
-# Specific classes that are allowed
-SAFE_CLASSES: Set[str] = {
+# Prefix of all (absolute) paths of files within the models directory,
+# case-normalised to be compared against `os.path.normcase` paths
+_MODELS_DIR_PREFIX = os.path.normcase(os.path.join(str(MODELS_DIR), ''))
+
+# Allowlisted (module, name) pairs of classes and functions that are safe to
+# unpickle. Only these exact pairs are allowed, since allowing whole modules
+# exposes every (indirectly) importable callable of the module.
+SAFE_CLASSES: FrozenSet[Tuple[str, str]] = frozenset((
     # NumPy
-    'numpy.ndarray',
-    'numpy.dtype',
-    'numpy.core.multiarray._reconstruct',
-    'numpy.core.multiarray.scalar',
-    'numpy._core.multiarray._reconstruct',
-    'numpy._core.multiarray.scalar',
+    ('numpy', 'ndarray'),
+    ('numpy', 'dtype'),
+    ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy.core.multiarray', 'scalar'),
+    ('numpy.core.numeric', '_frombuffer'),
+    ('numpy._core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', 'scalar'),
+    ('numpy._core.numeric', '_frombuffer'),
     # SciPy sparse
-    'scipy.sparse._csr.csr_matrix',
-    'scipy.sparse.csr.csr_matrix',
+    ('scipy.sparse._csr', 'csr_matrix'),
+    ('scipy.sparse.csr', 'csr_matrix'),
     # Built-in types
-    'builtins.dict',
-    'builtins.list',
-    'builtins.tuple',
-    'builtins.set',
-    'builtins.frozenset',
-    'builtins.bytes',
-    'builtins.bytearray',
-    'collections.OrderedDict',
+    ('builtins', 'dict'),
+    ('builtins', 'list'),
+    ('builtins', 'tuple'),
+    ('builtins', 'set'),
+    ('builtins', 'frozenset'),
+    ('builtins', 'bytes'),
+    ('builtins', 'bytearray'),
+    ('collections', 'OrderedDict'),
+    # madmom classes
+    ('madmom.ml.nn', 'NeuralNetwork'),
+    ('madmom.ml.crf', 'ConditionalRandomField'),
     # madmom classes (layers)
-    'madmom.ml.nn.layers.FeedForwardLayer',
-    'madmom.ml.nn.layers.RecurrentLayer',
-    'madmom.ml.nn.layers.BidirectionalLayer',
-    'madmom.ml.nn.layers.ConvolutionalLayer',
-    'madmom.ml.nn.layers.StrideLayer',
-    'madmom.ml.nn.layers.MaxPoolLayer',
-    'madmom.ml.nn.layers.BatchNormLayer',
-    'madmom.ml.nn.layers.AverageLayer',
-    'madmom.ml.nn.layers.LSTMLayer',
-    'madmom.ml.nn.layers.GRULayer',
-    'madmom.ml.nn.layers.TransposedConvolutionalLayer',
-    'madmom.ml.nn.layers.PadLayer',
+    ('madmom.ml.nn.layers', 'FeedForwardLayer'),
+    ('madmom.ml.nn.layers', 'RecurrentLayer'),
+    ('madmom.ml.nn.layers', 'BidirectionalLayer'),
+    ('madmom.ml.nn.layers', 'Gate'),
+    ('madmom.ml.nn.layers', 'Cell'),
+    ('madmom.ml.nn.layers', 'LSTMLayer'),
+    ('madmom.ml.nn.layers', 'GRUCell'),
+    ('madmom.ml.nn.layers', 'GRULayer'),
+    ('madmom.ml.nn.layers', 'ConvolutionalLayer'),
+    ('madmom.ml.nn.layers', 'StrideLayer'),
+    ('madmom.ml.nn.layers', 'MaxPoolLayer'),
+    ('madmom.ml.nn.layers', 'BatchNormLayer'),
+    ('madmom.ml.nn.layers', 'TransposeLayer'),
+    ('madmom.ml.nn.layers', 'ReshapeLayer'),
+    ('madmom.ml.nn.layers', 'AverageLayer'),
+    ('madmom.ml.nn.layers', 'PadLayer'),
     # madmom activations
-    'madmom.ml.nn.activations.Activation',
-    'madmom.ml.nn.activations.sigmoid',
-    'madmom.ml.nn.activations.tanh',
-    'madmom.ml.nn.activations.relu',
-    'madmom.ml.nn.activations.elu',
-    'madmom.ml.nn.activations.softmax',
-    'madmom.ml.nn.activations.linear',
-}
+    ('madmom.ml.nn.activations', 'sigmoid'),
+    ('madmom.ml.nn.activations', 'tanh'),
+    ('madmom.ml.nn.activations', 'relu'),
+    ('madmom.ml.nn.activations', 'elu'),
+    ('madmom.ml.nn.activations', 'softmax'),
+    ('madmom.ml.nn.activations', 'linear'),
+))
+
+# Allowed classes and functions already resolved by the unpickler, so that
+# repeated occurrences within (and across) pickles skip the import machinery
+_RESOLVED: Dict[Tuple[str, str], Any] = {}
+
+
+def _user_cache_dir() -> Path:
+    """Return the platform specific user cache directory for madmom."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'madmom'
+
+
+# On-disk cache of file hashes, mapping absolute paths to
+# [mtime_ns, ctime_ns, size, sha256]; loaded lazily into `_hash_cache`
+_hash_cache_path = _user_cache_dir() / 'hashes.json'
+_hash_cache: Optional[dict] = None
+_hash_cache_lock = threading.Lock()
+
+# Parsed manifest, cached together with the manifest file's modification time
+# so that loading an ensemble does not re-read the JSON for every model file
+_manifest_cache: Optional[Tuple[int, dict]] = None
+
+
+def _warn_once(message: str) -> None:
+    """
+    Issue a UserWarning, with the default filters only once per process.
+
+    All warnings are issued from this very line, thus the registry of the
+    warnings module suppresses repetitions of the same message (e.g. when
+    loading a model ensemble), while 'error', 'ignore' or 'always' filters
+    set by the caller are still honoured.
+    """
+    warnings.warn(message, UserWarning, stacklevel=1)
 
 
 class ModelIntegrityError(Exception):
@@ -112,6 +149,9 @@ class RestrictedUnpickler(pickle.Unpickler):
     combinations during unpickling.
     """
 
+    # no per-instance state, an unpickler is created for every model file
+    __slots__ = ()
+
     def find_class(self, module: str, name: str) -> Any:
         """
         Override find_class to restrict which classes can be instantiated.
@@ -133,33 +173,80 @@ class RestrictedUnpickler(pickle.Unpickler):
         UnsafePickleError
             If the module/class combination is not in the allowlist.
         """
-        full_name = f"{module}.{name}"
+        # Only allowed objects are cached, return them right away
+        key = (module, name)
+        obj = _RESOLVED.get(key)
+        if obj is not None:
+            return obj
 
         # Check if this specific class is allowed
-        if full_name in SAFE_CLASSES:
-            return super().find_class(module, name)
-
-        # Check if the module is in safe modules and the class looks safe
-        if module in SAFE_MODULES:
-            # Additional check: block anything that looks like code execution
-            dangerous_names = {'exec', 'eval', 'compile', 'open', 'input',
-                             '__import__', 'getattr', 'setattr', 'delattr',
-                             'globals', 'locals', '__builtins__', 'system',
-                             'popen', 'subprocess', 'os', 'sys'}
-            if name.lower() not in dangerous_names:
-                return super().find_class(module, name)
+        if key in SAFE_CLASSES:
+            obj = super().find_class(module, name)
+            _RESOLVED[key] = obj
+            return obj
 
         raise UnsafePickleError(
-            f"Blocked unsafe pickle class: {full_name}\n"
+            f"Blocked unsafe pickle class: {module}.{name}\n"
             f"This class is not in the allowlist for safe model loading.\n"
             f"If this is a legitimate madmom class, please report this issue."
         )
 
 
+def _hash_file(filepath: Path) -> str:
+    """Compute the SHA256 hash of a file's content."""
+    # hashlib resolves 'sha256' to OpenSSL's implementation when available,
+    # which uses the CPU's SHA extensions (x86 SHA-NI, ARMv8 SHA2) at runtime
+    with open(filepath, 'rb') as f:
+        # hash directly from the page cache, without copying to user space
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest()
+        except (OSError, ValueError):
+            # empty files and file systems which do not support mmap
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def _load_hash_cache() -> dict:
+    """Load the on-disk hash cache (once per process)."""
+    global _hash_cache
+    if _hash_cache is None:
+        try:
+            with open(_hash_cache_path, 'r') as f:
+                _hash_cache = json.load(f)
+        except (OSError, ValueError):
+            _hash_cache = {}
+        if not isinstance(_hash_cache, dict):
+            _hash_cache = {}
+    return _hash_cache
+
+
+def _save_hash_cache(cache: dict) -> None:
+    """Atomically write the hash cache; failures are silently ignored."""
+    try:
+        _hash_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=_hash_cache_path.parent,
+                                        suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, _hash_cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
 def compute_file_hash(filepath: Path) -> str:
     """
     Compute SHA256 hash of a file.
 
+    Hashes are cached on disk and reused as long as the file's modification
+    time, change time and size are unchanged. Thus the returned hash is not
+    necessarily computed from the file's current content, but may be read
+    from the user-writable cache file. Use `hashlib` directly on the data to
+    be verified if the hash must be computed freshly.
+
     Parameters
     ----------
     filepath : Path
@@ -170,47 +257,73 @@ def compute_file_hash(filepath: Path) -> str:
     str
         Hex-encoded SHA256 hash.
     """
-    sha256 = hashlib.sha256()
-    with open(filepath, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+    filepath = Path(filepath).resolve()
+    st = filepath.stat()
+    stat_key = [st.st_mtime_ns, st.st_ctime_ns, st.st_size]
+    with _hash_cache_lock:
+        entry = _load_hash_cache().get(str(filepath))
+    # only well-formed entries are used, anything else is re-hashed
+    if (isinstance(entry, list) and len(entry) == 4 and
+            entry[:3] == stat_key and isinstance(entry[3], str)):
+        return entry[3]
+    # new or modified file, (re-)compute the hash and update the cache
+    digest = _hash_file(filepath)
+    with _hash_cache_lock:
+        cache = _load_hash_cache()
+        cache[str(filepath)] = stat_key + [digest]
+        _save_hash_cache(cache)
+    return digest
 
 
 def load_manifest() -> dict:
     """
     Load the model manifest containing expected hashes.
 
+    The parsed manifest is cached and only re-read if the manifest file's
+    modification time changes.
+
     Returns
     -------
     dict
         Dictionary mapping model paths to their expected SHA256 hashes.
     """
+    global _manifest_cache
+
     manifest_path = MODELS_DIR / 'model_manifest.json'
-    if not manifest_path.exists():
-        warnings.warn(
+    try:
+        mtime = manifest_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _warn_once(
             "Model manifest not found. Hash verification disabled.\n"
-            "This reduces security - consider reinstalling madmom-modern.",
-            UserWarning
+            "This reduces security - consider reinstalling madmom-modern."
         )
         return {}
 
+    if _manifest_cache is not None and _manifest_cache[0] == mtime:
+        return _manifest_cache[1]
+
     with open(manifest_path, 'r') as f:
         manifest = json.load(f)
 
-    return manifest.get('models', {})
+    models = manifest.get('models', {})
+    _manifest_cache = (mtime, models)
+    return models
 
 
-def verify_model_integrity(filepath: Path, manifest: Optional[dict] = None) -> bool:
+def verify_model_integrity(filepath: Path, manifest: Optional[dict] = None,
+                           data: Optional[bytes] = None) -> bool:
     """
     Verify a model file's integrity using SHA256 hash.
 
     Parameters
     ----------
-    filepath : Path
+    filepath : Path or str
         Path to the model file.
     manifest : dict, optional
         Model manifest dictionary. If None, loads from default location.
+    data : bytes, optional
+        Content of the model file. If given, this content is verified instead
+        of (re-)reading the file.
 
     Returns
     -------
@@ -222,35 +335,37 @@ def verify_model_integrity(filepath: Path, manifest: Optional[dict] = None) -> b
     ModelIntegrityError
         If the file's hash doesn't match the expected value.
     """
-    if manifest is None:
-        manifest = load_manifest()
-
-    if not manifest:
-        return True  # No manifest, skip verification (with warning already issued)
-
     # Get relative path from models directory
-    try:
-        rel_path = filepath.relative_to(MODELS_DIR)
-        rel_path_str = str(rel_path).replace('\\', '/')  # Normalize for Windows
-    except ValueError:
+    # Path normalises separators and redundant components (lexically)
+    path_str = os.fspath(Path(filepath))
+    # compare case-insensitively on Windows (like `Path.relative_to`)
+    if not os.path.normcase(path_str).startswith(_MODELS_DIR_PREFIX):
         # File is not in models directory
-        warnings.warn(
+        _warn_once(
             f"Model file {filepath} is outside the models directory.\n"
-            "Hash verification skipped. Only load models from trusted sources!",
-            UserWarning
+            "Hash verification skipped. Only load models from trusted sources!"
         )
         return True
+    rel_path_str = path_str[len(_MODELS_DIR_PREFIX):].replace('\\', '/')  # Normalize for Windows
+
+    if manifest is None:
+        manifest = load_manifest()
+
+    if not manifest:
+        return True  # No manifest, skip verification (with warning already issued)
 
     expected_hash = manifest.get(rel_path_str)
     if expected_hash is None:
-        warnings.warn(
+        _warn_once(
             f"Model file {rel_path_str} not found in manifest.\n"
-            "Hash verification skipped. This file may have been added after installation.",
-            UserWarning
+            "Hash verification skipped. This file may have been added after installation."
         )
         return True
 
-    actual_hash = compute_file_hash(filepath)
+    if data is not None:
+        actual_hash = hashlib.sha256(data).hexdigest()
+    else:
+        actual_hash = compute_file_hash(filepath)
 
     if actual_hash != expected_hash:
         raise ModelIntegrityError(
@@ -266,7 +381,8 @@ def verify_model_integrity(filepath: Path, manifest: Optional[dict] = None) -> b
     return True
 
 
-def secure_load(filepath: Path, verify_hash: bool = True) -> Any:
+def secure_load(filepath: Path, verify_hash: bool = True,
+                manifest: Optional[dict] = None) -> Any:
     """
     Securely load a pickle model file with integrity verification.
 
@@ -282,6 +398,9 @@ def secure_load(filepath: Path, verify_hash: bool = True) -> Any:
     verify_hash : bool, optional
         Whether to verify the file's hash. Default True.
         Setting to False is STRONGLY DISCOURAGED.
+    manifest : dict, optional
+        Model manifest dictionary. If None, loads from default location.
+        Pass it explicitly when loading several models in a row.
 
     Returns
     -------
@@ -300,28 +419,128 @@ def secure_load(filepath: Path, verify_hash: bool = True) -> Any:
     if not filepath.exists():
         raise FileNotFoundError(f"Model file not found: {filepath}")
 
-    # Step 1: Verify integrity
+    # Step 1: Read the file and verify its integrity
     if verify_hash:
-        verify_model_integrity(filepath)
+        data = _read_and_verify(filepath, manifest)
     else:
-        warnings.warn(
+        _warn_once(
             "Hash verification disabled! This is a security risk.\n"
-            "Only disable this if you trust the source of the model file.",
-            UserWarning
+            "Only disable this if you trust the source of the model file."
         )
+        data = filepath.read_bytes()
 
     # Step 2: Load with restricted unpickler
-    with open(filepath, 'rb') as f:
+    return _restricted_load(filepath, data)
+
+
+def secure_load_many(filepaths: Iterable[Path], verify_hash: bool = True,
+                     manifest: Optional[dict] = None,
+                     max_workers: Optional[int] = None) -> List[Any]:
+    """
+    Securely load several pickle model files, e.g. a model ensemble.
+
+    The files are read and verified in parallel (hashing releases the GIL),
+    then unpickled one after the other with the restricted unpickler.
+
+    Parameters
+    ----------
+    filepaths : iterable of Path
+        Paths to the pickle files.
+    verify_hash : bool, optional
+        Whether to verify the files' hashes. Default True.
+        Setting to False is STRONGLY DISCOURAGED.
+    manifest : dict, optional
+        Model manifest dictionary. If None, loads from default location.
+    max_workers : int, optional
+        Number of threads used for reading and verification. Defaults to
+        the number of CPUs, but at most 8.
+
+    Returns
+    -------
+    list
+        The unpickled objects, in the order of `filepaths`.
+
+    Raises
+    ------
+    ModelIntegrityError
+        If hash verification fails for any of the files.
+    UnsafePickleError
+        If any of the pickles contains unsafe objects.
+    """
+    filepaths = [Path(f) for f in filepaths]
+
+    for filepath in filepaths:
+        if not filepath.exists():
+            raise FileNotFoundError(f"Model file not found: {filepath}")
+
+    # Step 1: Read and verify all files before loading any of them
+    if verify_hash:
+        if manifest is None:
+            manifest = load_manifest()
+        read = partial(_read_and_verify, manifest=manifest)
+    else:
+        _warn_once(
+            "Hash verification disabled! This is a security risk.\n"
+            "Only disable this if you trust the source of the model file."
+        )
+        read = Path.read_bytes
+    # let the kernel read all files ahead, also those not yet picked up by a
+    # worker thread
+    _prefetch(filepaths)
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    # the worker threads issue their reads concurrently, which keeps
+    # several requests in flight on cold storage without needing a
+    # platform specific batched I/O interface (e.g. io_uring)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # this re-raises the first verification error, if any
+        buffers = list(executor.map(read, filepaths))
+
+    # Step 2: Load with restricted unpickler
+    return [_restricted_load(filepath, data)
+            for filepath, data in zip(filepaths, buffers)]
+
+
+def _prefetch(filepaths: List[Path]) -> None:
+    """Advise the kernel to read the files into the page cache (POSIX only)."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for filepath in filepaths:
         try:
-            return RestrictedUnpickler(f).load()
-        except UnsafePickleError:
-            raise
-        except Exception as e:
-            raise UnsafePickleError(
-                f"Failed to load model file: {filepath}\n"
-                f"Error: {e}\n"
-                f"This may indicate a corrupted or incompatible model file."
-            ) from e
+            fd = os.open(filepath, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _read_and_verify(filepath: Path, manifest: Optional[dict] = None) -> bytes:
+    """Read a model file and verify the integrity of the content read."""
+    # hashing the very same buffer which gets unpickled reads the file only
+    # once and leaves no window for the file to change in between
+    data = filepath.read_bytes()
+    verify_model_integrity(filepath, manifest, data)
+    return data
+
+
+def _restricted_load(filepath: Path, data: bytes) -> Any:
+    """Unpickle the content of a model file with the restricted unpickler."""
+    # unpickling from memory avoids the many small reads the unpickler would
+    # otherwise issue on a file handle
+    try:
+        return RestrictedUnpickler(io.BytesIO(data)).load()
+    except UnsafePickleError:
+        raise
+    except Exception as e:
+        raise UnsafePickleError(
+            f"Failed to load model file: {filepath}\n"
+            f"Error: {e}\n"
+            f"This may indicate a corrupted or incompatible model file."
+        ) from e
 
 
 def load_model(model_path: str, verify_hash: bool = True) -> Any:
@@ -17,11 +17,8 @@ from pathlib import Path
 
 def compute_file_hash(filepath: Path) -> str:
     """Compute SHA256 hash of a file."""
-    sha256 = hashlib.sha256()
     with open(filepath, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+        return hashlib.file_digest(f, 'sha256').hexdigest()
 
 
 def main():
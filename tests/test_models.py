@@ -0,0 +1,289 @@
+# encoding: utf-8
+# pylint: skip-file
+"""
+This file contains tests for the madmom.models module.
+
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+
+from madmom.models import *
+from madmom.models import secure_loader
+from madmom.models.secure_loader import *
+
+_cache_state = {}
+
+
+def setUpModule():
+    # redirect the hash cache, no test must touch the user's cache directory
+    _cache_state['tmp_dir'] = tempfile.TemporaryDirectory()
+    _cache_state['path'] = secure_loader._hash_cache_path
+    _cache_state['cache'] = secure_loader._hash_cache
+    secure_loader._hash_cache_path = (Path(_cache_state['tmp_dir'].name) /
+                                      'hashes.json')
+    secure_loader._hash_cache = None
+
+
+def tearDownModule():
+    secure_loader._hash_cache_path = _cache_state['path']
+    secure_loader._hash_cache = _cache_state['cache']
+    _cache_state['tmp_dir'].cleanup()
+
+
+class TestModelsFunction(unittest.TestCase):
+
+    def test_values(self):
+        self.assertEqual(len(BEATS_LSTM), 8)
+        self.assertEqual(BEATS_LSTM, sorted(BEATS_LSTM))
+        self.assertTrue(all(os.path.isfile(f) for f in BEATS_LSTM))
+        self.assertEqual(models('beats/2016/beats_lstm_1.pkl'),
+                         BEATS_LSTM[:1])
+        # wildcards in the directory part
+        self.assertEqual(models('beats/*/beats_lstm_1.pkl'), BEATS_LSTM[:1])
+        # non-existing files and directories
+        self.assertEqual(models('beats/2016/beats_lstm_9.pkl'), [])
+        self.assertEqual(models('nope/2016/*.pkl'), [])
+        # patterns ending with a separator match the directory itself
+        self.assertEqual(models('beats/2016/'),
+                         ['%s/beats/2016/' % MODEL_PATH])
+
+    def test_path(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertEqual(models('*.pkl', tmp_dir), [])
+            # listings of user supplied paths are not cached
+            Path(tmp_dir, 'x.pkl').write_bytes(b'')
+            self.assertEqual(models('*.pkl', tmp_dir),
+                             [os.path.join(tmp_dir, 'x.pkl')])
+
+
+class TestLazyModelAttributes(unittest.TestCase):
+
+    def test_values(self):
+        import madmom.models
+        self.assertIn('KEY_CNN', dir(madmom.models))
+        self.assertIn('KEY_CNN', madmom.models.__all__)
+        self.assertEqual(len(DOWNBEATS_BGRU), 2)
+        self.assertEqual(madmom.models.KEY_CNN, KEY_CNN)
+        # retrieved model files are cached as module attributes
+        self.assertIn('KEY_CNN', vars(madmom.models))
+
+    def test_errors(self):
+        import madmom.models
+        with self.assertRaises(AttributeError):
+            madmom.models.NO_SUCH_MODEL
+
+
+class TestLoadManifestFunction(unittest.TestCase):
+
+    def test_types(self):
+        manifest = load_manifest()
+        self.assertIsInstance(manifest, dict)
+        self.assertIn('beats/2016/beats_lstm_1.pkl', manifest)
+
+    def test_cache(self):
+        manifest = load_manifest()
+        # the parsed manifest is reused as long as the file is unchanged
+        self.assertIs(load_manifest(), manifest)
+        # a stale cache entry is not returned
+        secure_loader._manifest_cache = (-1, {})
+        self.assertEqual(load_manifest(), manifest)
+
+
+class TestRestrictedUnpicklerClass(unittest.TestCase):
+
+    def test_find_class(self):
+        import numpy as np
+        unpickler = RestrictedUnpickler(io.BytesIO())
+        self.assertIs(unpickler.find_class('numpy', 'ndarray'), np.ndarray)
+        self.assertIs(secure_loader._RESOLVED[('numpy', 'ndarray')],
+                      np.ndarray)
+        # resolved objects are reused
+        self.assertIs(unpickler.find_class('numpy', 'ndarray'), np.ndarray)
+
+    def test_slots(self):
+        unpickler = RestrictedUnpickler(io.BytesIO())
+        self.assertFalse(hasattr(unpickler, '__dict__'))
+
+    def test_errors(self):
+        unpickler = RestrictedUnpickler(io.BytesIO())
+        with self.assertRaises(UnsafePickleError):
+            unpickler.find_class('os', 'system')
+        with self.assertRaises(UnsafePickleError):
+            unpickler.find_class('builtins', 'eval')
+        self.assertNotIn(('builtins', 'eval'), secure_loader._RESOLVED)
+        # only explicitly allowed pairs, not whole modules, can be loaded
+        with self.assertRaises(UnsafePickleError):
+            unpickler.find_class('numpy.testing._private.utils', 'runstring')
+        with self.assertRaises(UnsafePickleError):
+            unpickler.find_class('builtins', 'map')
+        with self.assertRaises(UnsafePickleError):
+            unpickler.find_class('collections', '_itemgetter')
+        data = pickle.dumps(os.system)
+        with self.assertRaises(UnsafePickleError):
+            RestrictedUnpickler(io.BytesIO(data)).load()
+
+
+class TestComputeFileHashFunction(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # start with an empty (module-wide redirected) hash cache
+        secure_loader._hash_cache = None
+        if secure_loader._hash_cache_path.exists():
+            secure_loader._hash_cache_path.unlink()
+        self.file = Path(self.tmp_dir.name) / 'model.pkl'
+        self.file.write_bytes(b'madmom')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_values(self):
+        digest = hashlib.sha256(b'madmom').hexdigest()
+        self.assertEqual(compute_file_hash(self.file), digest)
+        self.assertTrue(secure_loader._hash_cache_path.exists())
+        # cached hashes are reused for unchanged files
+        key = str(self.file.resolve())
+        secure_loader._hash_cache[key][3] = 'cached'
+        self.assertEqual(compute_file_hash(self.file), 'cached')
+        # damaged cache entries are ignored
+        secure_loader._hash_cache[key] = secure_loader._hash_cache[key][:3]
+        self.assertEqual(compute_file_hash(self.file), digest)
+        secure_loader._hash_cache[key][3] = None
+        self.assertEqual(compute_file_hash(self.file), digest)
+        # the cache is persisted and reloaded
+        secure_loader._hash_cache = None
+        self.assertEqual(compute_file_hash(self.file), digest)
+        # modified files are re-hashed
+        self.file.write_bytes(b'modified')
+        os.utime(self.file, ns=(0, 0))
+        self.assertEqual(compute_file_hash(self.file),
+                         hashlib.sha256(b'modified').hexdigest())
+        # empty files can not be memory mapped
+        self.file.write_bytes(b'')
+        os.utime(self.file, ns=(1, 1))
+        self.assertEqual(compute_file_hash(self.file),
+                         hashlib.sha256(b'').hexdigest())
+
+
+class TestVerifyModelIntegrityFunction(unittest.TestCase):
+
+    def test_values(self):
+        self.assertTrue(verify_model_integrity(Path(BEATS_LSTM[0])))
+        manifest = load_manifest()
+        self.assertTrue(verify_model_integrity(Path(BEATS_LSTM[0]),
+                                               manifest))
+        # plain strings are accepted as well
+        self.assertTrue(verify_model_integrity(BEATS_LSTM[0]))
+
+    def test_non_normalised_path(self):
+        manifest = {'beats/2016/beats_lstm_1.pkl': '0' * 64}
+        for path in ['%s/beats/2016/./beats_lstm_1.pkl' % MODELS_DIR,
+                     '%s//beats//2016/beats_lstm_1.pkl' % MODELS_DIR]:
+            # the file must be looked up in the manifest and fail the check
+            with self.assertRaises(ModelIntegrityError):
+                verify_model_integrity(path, manifest)
+
+    def test_case_insensitive_file_system(self):
+        # emulate Windows, where paths differing in case are the same
+        from unittest import mock
+        prefix = os.path.join(str(MODELS_DIR), '').lower()
+        path = '%s/beats/2016/beats_lstm_1.pkl' % str(MODELS_DIR).upper()
+        manifest = {'beats/2016/beats_lstm_1.pkl': '0' * 64}
+        with mock.patch.object(secure_loader, '_MODELS_DIR_PREFIX', prefix), \
+                mock.patch('os.path.normcase', str.lower):
+            with self.assertRaises(ModelIntegrityError):
+                verify_model_integrity(path, manifest, data=b'madmom')
+
+    def test_outside_models_dir(self):
+        with tempfile.NamedTemporaryFile(suffix='.pkl') as f:
+            with self.assertWarns(UserWarning):
+                self.assertTrue(verify_model_integrity(Path(f.name)))
+
+    def test_data(self):
+        data = Path(BEATS_LSTM[0]).read_bytes()
+        self.assertTrue(verify_model_integrity(Path(BEATS_LSTM[0]),
+                                               data=data))
+        with self.assertRaises(ModelIntegrityError):
+            verify_model_integrity(Path(BEATS_LSTM[0]), data=data[:-1])
+
+    def test_errors(self):
+        manifest = {'beats/2016/beats_lstm_1.pkl': '0' * 64}
+        with self.assertRaises(ModelIntegrityError):
+            verify_model_integrity(Path(BEATS_LSTM[0]), manifest)
+
+
+class TestSecureLoadFunction(unittest.TestCase):
+
+    def test_values(self):
+        from madmom.ml.nn import NeuralNetwork
+        nn = secure_load(BEATS_LSTM[0])
+        self.assertIsInstance(nn, NeuralNetwork)
+        nn = load_model('beats/2016/beats_lstm_1.pkl')
+        self.assertIsInstance(nn, NeuralNetwork)
+
+    def test_errors(self):
+        with self.assertRaises(FileNotFoundError):
+            secure_load(MODELS_DIR / 'does_not_exist.pkl')
+        # the content read is verified before it is unpickled
+        from unittest import mock
+        manifest = {'beats/2016/beats_lstm_1.pkl': '0' * 64}
+        with mock.patch.object(secure_loader, '_restricted_load') as load:
+            with self.assertRaises(ModelIntegrityError):
+                secure_load(BEATS_LSTM[0], manifest=manifest)
+            load.assert_not_called()
+
+    def test_warnings(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('default')
+            secure_load(BEATS_LSTM[0], verify_hash=False)
+            secure_load_many(BEATS_LSTM[:2], verify_hash=False)
+        # with the default filters the warning is issued only once
+        self.assertEqual(len(w), 1)
+        self.assertIn('Hash verification disabled', str(w[0].message))
+        # filters set by the caller are honoured for every call
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            for _ in range(2):
+                with self.assertRaises(UserWarning):
+                    secure_load(BEATS_LSTM[0], verify_hash=False)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('ignore')
+            secure_load(BEATS_LSTM[0], verify_hash=False)
+            warnings.simplefilter('default')
+            secure_load(BEATS_LSTM[0], verify_hash=False)
+        self.assertEqual(len(w), 1)
+
+
+class TestSecureLoadManyFunction(unittest.TestCase):
+
+    def test_values(self):
+        from madmom.ml.nn import NeuralNetwork
+        nns = secure_load_many(BEATS_LSTM)
+        self.assertEqual(len(nns), len(BEATS_LSTM))
+        for nn in nns:
+            self.assertIsInstance(nn, NeuralNetwork)
+        nns = secure_load_many(BEATS_LSTM[:2], max_workers=1)
+        self.assertEqual(len(nns), 2)
+
+    def test_errors(self):
+        with self.assertRaises(FileNotFoundError):
+            secure_load_many([BEATS_LSTM[0],
+                              MODELS_DIR / 'does_not_exist.pkl'])
+        # a single mismatching file fails the whole ensemble before any of
+        # the files is unpickled
+        from unittest import mock
+        manifest = dict(load_manifest())
+        manifest['beats/2016/beats_lstm_3.pkl'] = '0' * 64
+        with mock.patch.object(secure_loader, '_restricted_load') as load:
+            with self.assertRaises(ModelIntegrityError):
+                secure_load_many(BEATS_LSTM, manifest=manifest)
+            load.assert_not_called()